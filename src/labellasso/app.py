@@ -5,40 +5,88 @@
 """Bokeh application for labellasso."""
 
 from pathlib import Path
-from typing import Callable
+from typing import Callable, Optional, Sequence
 
+import numpy as np
 from bokeh.document import Document
 from bokeh.layouts import column, row
 from bokeh.server.server import Server
 
 from labellasso.data import (
+    DataValidationError,
     create_column_data_source,
+    create_details_lookup,
+    decode_selection,
     get_label_statistics,
     load_data,
+    merge_labels,
     save_data,
     update_labels,
 )
 from labellasso.plot import (
+    create_apply_button,
+    create_details_panel,
+    create_details_request,
     create_input_widget,
     create_save_button,
     create_scatter_plot,
+    create_selection_source,
+    update_details_panel,
     update_plot_title,
 )
 
 
-def create_bokeh_app(input_file_path: str) -> Callable[[Document], None]:
+def create_bokeh_app(
+    input_file_path: str,
+    label_files: Sequence[str] = (),
+    conflict_policy: str = "keep",
+    conflict_report_path: Optional[str] = None,
+    details: bool = False,
+    detail_columns: Sequence[str] = (),
+    coordinates: Optional[np.ndarray] = None,
+    exclude_columns: Sequence[str] = (),
+) -> Callable[[Document], None]:
     """
     Create a Bokeh application for interactive data labeling.
 
     Args:
         input_file_path: Path to the input CSV file
+        label_files: Paths to labelled files whose labels are merged in
+        conflict_policy: How to resolve conflicting labels when merging
+        conflict_report_path: Optional path to write the merge conflict report
+        details: Only send coordinates and labels to the browser, and look up
+            point details on the server when hovered
+        detail_columns: Extra columns shown in details mode besides the name
+        coordinates: Optional precomputed x and y coordinates, e.g. from
+            labellasso.projection.project_features
+        exclude_columns: Input columns to leave out of the app, e.g. the
+            projected feature columns
 
     Returns:
         Callable function to be used with Bokeh server
 
     Raises:
-        FileNotFoundError: If the input file doesn't exist
+        FileNotFoundError: If the input file or a label file doesn't exist
+        DataValidationError: If the input or a label file is invalid, or a
+            detail column is missing
     """
+    # Load data and merge labels once, shared by all sessions
+    loaded_df, output_path = load_data(
+        Path(input_file_path), coordinates, exclude_columns
+    )
+    # Check detail columns up front so a typo fails at startup, not per session
+    if details:
+        missing_columns = [c for c in detail_columns if c not in loaded_df.columns]
+        if missing_columns:
+            raise DataValidationError(
+                f"Missing detail columns: {', '.join(missing_columns)}"
+            )
+    if label_files:
+        loaded_df, conflicts = merge_labels(
+            loaded_df, [Path(f) for f in label_files], conflict_policy
+        )
+        if conflict_report_path is not None:
+            conflicts.to_csv(conflict_report_path, index=False)
 
     def app(doc: Document) -> None:
         """
@@ -47,14 +95,18 @@ def create_bokeh_app(input_file_path: str) -> Callable[[Document], None]:
         Args:
             doc: Bokeh document to populate
         """
-        input_file = Path(input_file_path)
-
         try:
-            # Load and validate data
-            df, output_path = load_data(input_file)
+            # Each session labels its own copy of the data
+            df = loaded_df.copy()
 
             # Create data source
-            source = create_column_data_source(df)
+            if details:
+                lookup = create_details_lookup(df, ["name", *detail_columns])
+                source = create_column_data_source(df, ["x", "y", "label"])
+                tooltips = [("Label", "@label")]
+            else:
+                source = create_column_data_source(df)
+                tooltips = None
 
             # Get label statistics
             unlabeled_percentage, unique_labels = get_label_statistics(df)
@@ -64,17 +116,23 @@ def create_bokeh_app(input_file_path: str) -> Callable[[Document], None]:
                 source,
                 [*list(unique_labels), ""],
                 f"Scatter plot lasso labeller, labeled: {100-unlabeled_percentage:.1f}%",
+                tooltips,
             )
 
+            # Mirror the selection as compact index ranges or a bitset
+            selection = create_selection_source(source)
+
             # Set up widgets
             text = create_input_widget()
+            apply_button = create_apply_button()
             button = create_save_button()
 
             # Set up callbacks
-            def add_label_callback(attrname: str, old: str, new: str) -> None:
+            def add_label_callback() -> None:
                 """Callback for adding labels to selected points."""
                 nonlocal df
-                df = update_labels(df, source, source.selected.indices, text.value)
+                indices = decode_selection(dict(selection.data), len(df))
+                df = update_labels(df, source, indices, text.value)
                 unlabeled_percentage, _ = get_label_statistics(df)
                 update_plot_title(p, unlabeled_percentage)
 
@@ -95,11 +153,24 @@ def create_bokeh_app(input_file_path: str) -> Callable[[Document], None]:
                     )
 
             # Connect callbacks
-            text.on_change("value", add_label_callback)
+            apply_button.on_click(add_label_callback)
             button.on_click(save_data_callback)
 
             # Set up layout
-            inputs = column(text, button)
+            inputs = column(text, apply_button, button)
+
+            if details:
+                request = create_details_request(hover)
+                panel = create_details_panel()
+
+                def show_details_callback(attrname: str, old: dict, new: dict) -> None:
+                    """Callback for showing details of the hovered point."""
+                    if len(new["index"]) > 0:
+                        update_details_panel(panel, lookup(int(new["index"][0])))
+
+                request.on_change("data", show_details_callback)
+                inputs.children.append(panel)
+
             doc.add_root(row(inputs, p, width=800))
             doc.title = "LabelLasso"
 
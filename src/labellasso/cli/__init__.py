@@ -5,12 +5,20 @@
 """Command line interface for labellasso."""
 
 import sys
+from pathlib import Path
+from typing import List, Optional, Tuple
 
 import click
 
 from labellasso.__about__ import __version__
 from labellasso.app import create_bokeh_app, start_bokeh_server
-from labellasso.data import DataValidationError
+from labellasso.data import CONFLICT_POLICIES, DataValidationError
+from labellasso.projection import (
+    DEFAULT_CACHE_DIR,
+    PROJECTION_METHODS,
+    project_features,
+    resolve_feature_columns,
+)
 
 
 @click.command(
@@ -29,6 +37,55 @@ from labellasso.data import DataValidationError
 @click.option(
     "--name-column", default="name", help="Name of the column to use for point names."
 )
+@click.option(
+    "--merge-labels",
+    "label_files",
+    multiple=True,
+    type=click.Path(exists=True),
+    help="Labelled CSV/Parquet file to merge labels from (repeatable).",
+)
+@click.option(
+    "--conflict-policy",
+    default="keep",
+    type=click.Choice(CONFLICT_POLICIES),
+    help="How to resolve conflicting labels when merging.",
+)
+@click.option(
+    "--conflict-report",
+    default=None,
+    type=click.Path(dir_okay=False),
+    help="Write merge conflicts to this CSV file.",
+)
+@click.option(
+    "--details",
+    is_flag=True,
+    help="Look up point details on hover instead of sending them to the browser.",
+)
+@click.option(
+    "--detail-column",
+    "detail_columns",
+    multiple=True,
+    help="Extra column to show in details mode (repeatable).",
+)
+@click.option(
+    "--features",
+    default=None,
+    help="Comma-separated feature columns or patterns (e.g. 'emb_*') to "
+    "project to x/y instead of using the x and y columns.",
+)
+@click.option(
+    "--projection",
+    default="pca",
+    type=click.Choice(PROJECTION_METHODS),
+    help="Method used to project feature columns.",
+)
+@click.option(
+    "--cache-dir",
+    default=str(DEFAULT_CACHE_DIR),
+    type=click.Path(file_okay=False),
+    help="Directory for cached projections.",
+)
+@click.option("--no-cache", is_flag=True, help="Always recompute the projection.")
 @click.version_option(version=__version__, prog_name="labellasso")
 @click.argument("input_file", type=click.Path(exists=True))
 def labellasso(
@@ -37,6 +94,15 @@ def labellasso(
     x_column: str,
     y_column: str,
     name_column: str,
+    label_files: Tuple[str, ...],
+    conflict_policy: str,
+    conflict_report: Optional[str],
+    details: bool,
+    detail_columns: Tuple[str, ...],
+    features: Optional[str],
+    projection: str,
+    cache_dir: str,
+    no_cache: bool,
     input_file: str,
 ) -> None:
     """
@@ -49,14 +115,56 @@ def labellasso(
 
     The tool will create a new file with the suffix '_labelled' containing
     the original data plus a 'label' column with the assigned labels.
+
+    Existing labels from other labelled files can be merged in with
+    --merge-labels, matching points on the name column.
+
+    For large files, --details keeps names and other columns on the server
+    and fetches them only for the point under the cursor.
+
+    With --features, the x/y layout is computed from the given feature
+    columns and cached, so relaunching on the same file skips the projection.
     """
     try:
         # Display startup information
         click.echo(f"LabelLasso v{__version__}")
         click.echo(f"Opening Bokeh application on http://{address}:{port}/")
 
+        # Project feature columns to a 2D layout
+        coordinates = None
+        feature_columns: List[str] = []
+        if features:
+            feature_columns = resolve_feature_columns(
+                Path(input_file), [f.strip() for f in features.split(",") if f.strip()]
+            )
+            click.echo(
+                f"Projecting {len(feature_columns)} feature column(s) with {projection}"
+            )
+            coordinates, cached = project_features(
+                Path(input_file),
+                feature_columns,
+                projection,
+                cache_dir=None if no_cache else Path(cache_dir),
+            )
+            if cached:
+                click.echo("Loaded cached projection")
+
         # Create and start the application
-        app = create_bokeh_app(input_file)
+        if label_files:
+            click.echo(
+                f"Merging labels from {len(label_files)} file(s) "
+                f"(conflict policy: {conflict_policy})"
+            )
+        app = create_bokeh_app(
+            input_file,
+            label_files,
+            conflict_policy,
+            conflict_report,
+            details,
+            detail_columns,
+            coordinates,
+            feature_columns,
+        )
         start_bokeh_server(app, port, address)
 
     except FileNotFoundError as e:
@@ -65,6 +173,9 @@ def labellasso(
     except DataValidationError as e:
         click.secho(f"Error in input data: {e}", fg="red")
         sys.exit(1)
+    except ImportError as e:
+        click.secho(f"Error: {e}", fg="red")
+        sys.exit(1)
     except Exception as e:
         click.secho(f"Unexpected error: {e}", fg="red")
         sys.exit(1)
@@ -0,0 +1,86 @@
+# SPDX-FileCopyrightText: 2023-present Henry Watkins <h.watkins@ucl.ac.uk>
+#
+# SPDX-License-Identifier: MIT
+
+"""Command line interface for the labellasso load tester."""
+
+import sys
+
+import click
+
+from labellasso.__about__ import __version__
+from labellasso.loadtest import LoadTestError, format_report, run_load_test
+
+
+@click.command(
+    context_settings={"help_option_names": ["-h", "--help"]},
+)
+@click.option("--sessions", default=10, type=int, help="Number of concurrent sessions.")
+@click.option(
+    "--duration", default=30.0, type=float, help="Duration of the test in seconds."
+)
+@click.option(
+    "--select-rate",
+    default=1.0,
+    type=float,
+    help="Selections per second per session.",
+)
+@click.option(
+    "--label-rate",
+    default=0.5,
+    type=float,
+    help="Label applications per second per session.",
+)
+@click.option(
+    "--save-rate", default=0.1, type=float, help="Saves per second per session."
+)
+@click.option(
+    "--selection-size",
+    default=100,
+    type=int,
+    help="Number of points in each simulated selection.",
+)
+@click.option("--seed", default=0, type=int, help="Random seed.")
+@click.version_option(version=__version__, prog_name="labellasso-loadtest")
+@click.argument("input_file", type=click.Path(exists=True))
+def loadtest(
+    sessions: int,
+    duration: float,
+    select_rate: float,
+    label_rate: float,
+    save_rate: float,
+    selection_size: int,
+    seed: int,
+    input_file: str,
+) -> None:
+    """
+    Load test the labellasso Bokeh server with simulated sessions.
+
+    Starts a local server on a copy of INPUT_FILE and drives concurrent
+    sessions against it through the Bokeh client API, without a browser.
+    Reports per-operation latency percentiles, server CPU and memory, and
+    websocket bytes.
+    """
+    try:
+        click.echo(
+            f"Running {sessions} session(s) for {duration:.1f}s against {input_file}"
+        )
+        report = run_load_test(
+            input_file,
+            sessions,
+            duration,
+            select_rate,
+            label_rate,
+            save_rate,
+            selection_size,
+            seed,
+        )
+        click.echo(format_report(report))
+
+    except (LoadTestError, ValueError) as e:
+        click.secho(f"Error: {e}", fg="red")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    loadtest()
@@ -4,12 +4,19 @@
 
 """Data loading, validation, and saving functionality for labellasso."""
 
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Set, Tuple
+from typing import Any, Callable, Dict, Mapping, Optional, Sequence, Set, Tuple, Union
 
+import numpy as np
 import pandas as pd
 from bokeh.models import ColumnDataSource
 
+CONFLICT_POLICIES = ("keep", "overwrite", "flag")
+
+# Approximate serialized size of one slice entry in a source patch, in bytes
+PATCH_RUN_BYTES = 57
+
 
 class DataValidationError(Exception):
     """Exception raised when data validation fails."""
@@ -17,12 +24,20 @@ class DataValidationError(Exception):
     pass
 
 
-def load_data(input_file: Path) -> Tuple[pd.DataFrame, Path]:
+def load_data(
+    input_file: Path,
+    coordinates: Optional[np.ndarray] = None,
+    exclude_columns: Sequence[str] = (),
+) -> Tuple[pd.DataFrame, Path]:
     """
     Load data from a CSV file and validate its structure.
 
     Args:
         input_file: Path to the input CSV file
+        coordinates: Optional array of shape (rows, 2) used as the 'x' and
+            'y' columns, e.g. a projection of feature columns
+        exclude_columns: Columns not to read, e.g. feature columns that have
+            already been projected to coordinates
 
     Returns:
         Tuple containing the loaded DataFrame and the path for saving labeled data
@@ -36,10 +51,25 @@ def load_data(input_file: Path) -> Tuple[pd.DataFrame, Path]:
         raise FileNotFoundError(f"Input file not found: {input_file}")
 
     try:
-        df = pd.read_csv(input_file, index_col=False)
+        excluded = set(exclude_columns)
+        # Names are identifiers, so keep e.g. '001' rather than parsing 1.0
+        df = pd.read_csv(
+            input_file,
+            index_col=False,
+            dtype={"name": str},
+            usecols=(lambda column: column not in excluded) if excluded else None,
+        )
     except pd.errors.ParserError as e:
         raise DataValidationError(f"Failed to parse CSV file: {e}")
 
+    if coordinates is not None:
+        if len(coordinates) != len(df):
+            raise DataValidationError(
+                f"Got {len(coordinates)} coordinates for {len(df)} rows"
+            )
+        df["x"] = coordinates[:, 0]
+        df["y"] = coordinates[:, 1]
+
     # Check for required columns
     required_columns = {"name", "x", "y"}
     missing_columns = required_columns - set(df.columns)
@@ -63,17 +93,72 @@ def load_data(input_file: Path) -> Tuple[pd.DataFrame, Path]:
     return df, output_path
 
 
-def create_column_data_source(df: pd.DataFrame) -> ColumnDataSource:
+def create_column_data_source(
+    df: pd.DataFrame, columns: Optional[Sequence[str]] = None
+) -> ColumnDataSource:
     """
     Create a ColumnDataSource from a DataFrame.
 
     Args:
         df: DataFrame containing the data
+        columns: Optional subset of columns to send to the browser; when
+            omitted the whole DataFrame is used
 
     Returns:
         ColumnDataSource for Bokeh visualizations
     """
-    return ColumnDataSource(df)
+    if columns is None:
+        return ColumnDataSource(df)
+    return ColumnDataSource(data={column: df[column].to_numpy() for column in columns})
+
+
+def create_details_lookup(
+    df: pd.DataFrame, columns: Sequence[str], maxsize: int = 4096
+) -> Callable[[int], Tuple[Tuple[str, str], ...]]:
+    """
+    Create a cached lookup of per-point details by row index.
+
+    Static columns are cached per row. The 'label' column changes as points
+    are relabelled, so it is always read live from ``df``.
+
+    Args:
+        df: DataFrame containing the data
+        columns: Columns to include in the details
+        maxsize: Maximum number of rows kept in the LRU cache
+
+    Returns:
+        Function mapping a row index to (column, value) pairs
+
+    Raises:
+        DataValidationError: If any of the columns is missing
+    """
+    missing_columns = [column for column in columns if column not in df.columns]
+    if missing_columns:
+        raise DataValidationError(
+            f"Missing detail columns: {', '.join(missing_columns)}"
+        )
+
+    arrays = [
+        (column, df[column].fillna("").to_numpy())
+        for column in columns
+        if column != "label"
+    ]
+
+    @lru_cache(maxsize=maxsize)
+    def static_details(index: int) -> Dict[str, str]:
+        return {column: str(values[index]) for column, values in arrays}
+
+    def lookup(index: int) -> Tuple[Tuple[str, str], ...]:
+        cached = static_details(index)
+        return tuple(
+            (
+                column,
+                str(df["label"].iat[index]) if column == "label" else cached[column],
+            )
+            for column in columns
+        )
+
+    return lookup
 
 
 def save_data(df: pd.DataFrame, output_path: Path) -> None:
@@ -123,12 +208,112 @@ def get_label_statistics(df: pd.DataFrame) -> Tuple[float, Set[str]]:
     return unlabeled, unique_labels
 
 
+def encode_index_ranges(
+    indices: Union[Sequence[int], np.ndarray],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Run-length encode point indices as half-open ranges.
+
+    Args:
+        indices: Indices of data points, in any order and possibly repeated
+
+    Returns:
+        Tuple containing the range start and stop arrays, such that the
+        indices are the union of ``range(start, stop)`` over all ranges
+    """
+    idx = np.unique(np.asarray(indices, dtype=np.int64))
+    if idx.size == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    breaks = np.flatnonzero(np.diff(idx) != 1) + 1
+    starts = idx[np.r_[0, breaks]]
+    stops = idx[np.r_[breaks - 1, idx.size - 1]] + 1
+    return starts, stops
+
+
+def decode_index_ranges(
+    starts: Union[Sequence[int], np.ndarray], stops: Union[Sequence[int], np.ndarray]
+) -> np.ndarray:
+    """
+    Expand half-open index ranges into an array of point indices.
+
+    Args:
+        starts: Start index of each range
+        stops: Stop index (exclusive) of each range
+
+    Returns:
+        Array of point indices covered by the ranges
+    """
+    starts = np.asarray(starts, dtype=np.int64)
+    stops = np.asarray(stops, dtype=np.int64)
+    lengths = np.maximum(stops - starts, 0)
+    total = int(lengths.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64)
+
+    # Shift each range start back by its output offset, then add a running count
+    offsets = np.cumsum(lengths) - lengths
+    return np.repeat(starts - offsets, lengths) + np.arange(total)
+
+
+def encode_selection(
+    indices: Union[Sequence[int], np.ndarray], n_points: int
+) -> Dict[str, np.ndarray]:
+    """
+    Encode selected indices in whichever of two compact forms is smaller.
+
+    Contiguous selections are sent as int32 ``start``/``stop`` ranges (8 bytes
+    per range); scattered ones as a packed ``bits`` bitset of one bit per
+    point. This mirrors the browser-side encoder in
+    labellasso.plot.create_selection_source.
+
+    Args:
+        indices: Indices of selected data points
+        n_points: Number of points in the data source
+
+    Returns:
+        Selection source data with either ``start`` and ``stop`` or ``bits``
+    """
+    starts, stops = encode_index_ranges(indices)
+    if 8 * len(starts) <= (n_points + 7) // 8:
+        return {"start": starts.astype(np.int32), "stop": stops.astype(np.int32)}
+
+    mask = np.zeros(n_points, dtype=bool)
+    mask[np.asarray(indices, dtype=np.int64)] = True
+    return {"bits": np.packbits(mask)}
+
+
+def decode_selection(data: Mapping[str, Any], n_points: int) -> np.ndarray:
+    """
+    Decode a selection sent as index ranges or a packed bitset.
+
+    Args:
+        data: Selection source data, as produced by encode_selection
+        n_points: Number of points in the data source
+
+    Returns:
+        Array of selected point indices
+    """
+    if "bits" in data:
+        bits = np.asarray(data["bits"], dtype=np.uint8)
+        return np.flatnonzero(np.unpackbits(bits)[:n_points])
+    return decode_index_ranges(np.asarray(data["start"]), np.asarray(data["stop"]))
+
+
 def update_labels(
-    df: pd.DataFrame, source: ColumnDataSource, indices: List[int], label_value: str
+    df: pd.DataFrame,
+    source: ColumnDataSource,
+    indices: Union[Sequence[int], np.ndarray],
+    label_value: str,
 ) -> pd.DataFrame:
     """
     Update labels for selected data points.
 
+    Only the label column of the source is sent to the browser. It is
+    patched one contiguous range at a time when that is smaller than
+    resending the whole column, which is usually not the case for a lasso
+    over rows that are scattered in the file.
+
     Args:
         df: DataFrame containing the data
         source: ColumnDataSource for the plot
@@ -138,9 +323,179 @@ def update_labels(
     Returns:
         Updated DataFrame
     """
-    if not indices:
+    indices = np.asarray(indices, dtype=np.int64)
+    if indices.size == 0:
         return df
 
     df.loc[indices, "label"] = label_value
-    source.data = ColumnDataSource.from_df(df)
+
+    # Compare approximate JSON sizes: each label costs its length plus quotes
+    # and a separator, and each patched range adds a fixed overhead
+    starts, stops = encode_index_ranges(indices)
+    label_bytes = len(label_value) + 3
+    patch_cost = len(starts) * PATCH_RUN_BYTES + len(indices) * label_bytes
+    column_cost = int(df["label"].str.len().sum()) + 3 * len(df)
+
+    if patch_cost < column_cost:
+        source.patch(
+            {
+                "label": [
+                    (slice(int(start), int(stop)), [label_value] * int(stop - start))
+                    for start, stop in zip(starts, stops)
+                ]
+            }
+        )
+    else:
+        source.data["label"] = df["label"].to_numpy(copy=True)
     return df
+
+
+def read_label_file(label_file: Path, name_column: str = "name") -> pd.Series:
+    """
+    Read the labels from a previously labelled CSV or Parquet file.
+
+    Only the name and label columns are read. Unlabelled rows are dropped and,
+    where a name appears more than once, the last label wins.
+
+    Args:
+        label_file: Path to the labelled CSV or Parquet file
+        name_column: Name of the column used to match points
+
+    Returns:
+        Series of labels indexed by (unique) point name
+
+    Raises:
+        FileNotFoundError: If the label file doesn't exist
+        DataValidationError: If the file cannot be parsed or lacks columns
+        ImportError: If a Parquet file is given and pyarrow is not installed
+    """
+    if not label_file.exists():
+        raise FileNotFoundError(f"Label file not found: {label_file}")
+
+    columns = [name_column, "label"]
+    try:
+        if label_file.suffix.lower() in (".parquet", ".pq"):
+            labels = pd.read_parquet(label_file, columns=columns)
+        else:
+            labels = pd.read_csv(
+                label_file,
+                index_col=False,
+                usecols=columns,
+                dtype=str,
+                keep_default_na=False,
+            )
+    except ImportError:
+        raise ImportError(
+            "Reading Parquet label files requires the pyarrow package: "
+            "pip install 'labellasso[parquet]'"
+        )
+    except (pd.errors.ParserError, ValueError, KeyError) as e:
+        raise DataValidationError(
+            f"Failed to read '{name_column}' and 'label' columns from "
+            f"{label_file}: {e}"
+        )
+
+    names = labels[name_column].astype(str)
+    values = labels["label"].fillna("").astype(str)
+    mask = values.to_numpy() != ""
+    names, values = names[mask], values[mask]
+
+    keep = ~names.duplicated(keep="last").to_numpy()
+    incoming: pd.Series = pd.Series(
+        values.to_numpy()[keep], index=names.to_numpy()[keep]
+    )
+    return incoming
+
+
+def merge_labels(
+    df: pd.DataFrame,
+    label_files: Sequence[Path],
+    policy: str = "keep",
+    name_column: str = "name",
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Merge labels from other labelled files into a DataFrame.
+
+    Label files are joined on the name column with a hash lookup, so the
+    cost is linear in the size of both tables. Names are compared as strings.
+    Files are applied in order.
+    A conflict is a point whose existing label is non-empty and differs from
+    the incoming one; how it is resolved depends on the policy:
+
+    - ``keep``: the existing label is kept
+    - ``overwrite``: the incoming label replaces the existing one
+    - ``flag``: the point is left unlabelled so it can be reviewed by hand,
+      and later files neither fill it nor hide their disagreement
+
+    Args:
+        df: DataFrame containing the data and a 'label' column
+        label_files: Paths to labelled CSV or Parquet files
+        policy: Conflict policy, one of CONFLICT_POLICIES
+        name_column: Name of the column used to match points
+
+    Returns:
+        Tuple containing:
+        - DataFrame with merged labels
+        - Conflict report with columns name, existing_label, incoming_label
+          and source
+
+    Raises:
+        ValueError: If the policy is not recognised
+        DataValidationError: If the name column is missing from the data
+    """
+    if policy not in CONFLICT_POLICIES:
+        raise ValueError(
+            f"Unknown conflict policy '{policy}', "
+            f"expected one of: {', '.join(CONFLICT_POLICIES)}"
+        )
+    if name_column not in df.columns:
+        raise DataValidationError(f"Missing name column '{name_column}'")
+
+    names = df[name_column].astype(str)
+    labels = df["label"].astype(str).to_numpy(dtype=object)
+    # Under "flag", conflicting points stay unlabelled for all later files and
+    # are compared against the label they held when flagged
+    flagged = np.zeros(len(labels), dtype=bool)
+    held = np.full(len(labels), "", dtype=object)
+    reports = []
+
+    for label_file in label_files:
+        incoming = read_label_file(Path(label_file), name_column)
+        matched = names.map(incoming)
+        has_incoming = matched.notna().to_numpy()
+        incoming_labels = matched.to_numpy(dtype=object)
+
+        current = np.where(flagged, held, labels)
+        is_empty = current == ""
+        conflict = has_incoming & ~is_empty & (current != incoming_labels)
+
+        if conflict.any():
+            reports.append(
+                pd.DataFrame(
+                    {
+                        "name": names.to_numpy()[conflict],
+                        "existing_label": current[conflict],
+                        "incoming_label": incoming_labels[conflict],
+                        "source": str(label_file),
+                    }
+                )
+            )
+
+        fill = has_incoming & is_empty
+        if policy == "overwrite":
+            fill |= conflict
+        labels[fill] = incoming_labels[fill]
+        if policy == "flag":
+            newly_flagged = conflict & ~flagged
+            held[newly_flagged] = labels[newly_flagged]
+            flagged |= conflict
+            labels[flagged] = ""
+
+    df["label"] = labels
+    if reports:
+        report = pd.concat(reports, ignore_index=True)
+    else:
+        report = pd.DataFrame(
+            columns=["name", "existing_label", "incoming_label", "source"]
+        )
+    return df, report
@@ -0,0 +1,483 @@
+# SPDX-FileCopyrightText: 2023-present Henry Watkins <h.watkins@ucl.ac.uk>
+#
+# SPDX-License-Identifier: MIT
+
+"""Concurrent-session load testing for the labellasso Bokeh server."""
+
+import logging
+import multiprocessing
+import random
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Dict, List, Optional, Tuple
+
+import bokeh
+import numpy as np
+from bokeh.client import ClientSession
+from bokeh.client.util import websocket_url_for_server_url
+from bokeh.events import ButtonClick
+from bokeh.models import ColumnDataSource
+from bokeh.models.widgets import Button, TextInput
+
+from labellasso.data import encode_selection
+
+resource: Optional[ModuleType]
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+OPERATIONS = ("select", "label", "save")
+
+
+class LoadTestError(Exception):
+    """Exception raised when the load test cannot drive the application."""
+
+    pass
+
+
+def _free_port() -> int:
+    """Return a free TCP port on localhost."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("localhost", 0))
+        return int(sock.getsockname()[1])
+
+
+class _ErrorCounter(logging.Handler):
+    """Logging handler counting records at ERROR level and above."""
+
+    def __init__(self) -> None:
+        super().__init__(level=logging.ERROR)
+        self.count = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.count += 1
+
+
+def _serve(
+    input_file: str,
+    port: int,
+    ready: Any,
+    stop: Any,
+    stats: Any,
+) -> None:
+    """
+    Run the labellasso server until stopped, then report its resource usage.
+
+    Runs in a child process so that the CPU and memory reported are the
+    server's alone. Errors logged by the server, such as exceptions raised in
+    session callbacks, are counted and reported alongside.
+
+    Args:
+        input_file: Path to the input CSV file
+        port: Port to run the server on
+        ready: Event set once the server is accepting connections
+        stop: Event polled to shut the server down
+        stats: Connection on which resource usage is sent at shutdown
+    """
+    from bokeh.server.server import Server
+    from tornado.ioloop import PeriodicCallback
+
+    from labellasso.app import create_bokeh_app
+
+    # Bokeh logs callback exceptions instead of failing the client's request
+    error_counter = _ErrorCounter()
+    logging.getLogger().addHandler(error_counter)
+
+    server = Server(
+        {"/": create_bokeh_app(input_file)},
+        num_procs=1,
+        port=port,
+        address="localhost",
+    )
+    server.start()
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+
+    def check_stop() -> None:
+        if not stop.is_set():
+            return
+        peak_rss = None
+        if resource is not None:
+            # ru_maxrss is in kilobytes on Linux and bytes on macOS
+            peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            peak_rss *= 1 if sys.platform == "darwin" else 1024
+        stats.send(
+            {
+                "cpu_seconds": time.process_time() - cpu_start,
+                "wall_seconds": time.perf_counter() - wall_start,
+                "peak_rss_bytes": peak_rss,
+                "error_count": error_counter.count,
+            }
+        )
+        server.io_loop.stop()
+
+    PeriodicCallback(check_stop, 100).start()
+    ready.set()
+    server.io_loop.start()
+
+
+def _count_bytes(session: ClientSession, counter: Dict[str, int]) -> None:
+    """
+    Count the websocket bytes sent and received by a connected session.
+
+    Bokeh has no public hook for this, so the session's websocket wrapper is
+    instrumented. This is the only place the load test relies on Bokeh
+    internals.
+
+    Args:
+        session: Connected client session
+        counter: Dict with ``sent`` and ``received`` totals to update
+
+    Raises:
+        LoadTestError: If this Bokeh version's client internals are unsupported
+    """
+    connection = getattr(session, "_connection", None)
+    ws = getattr(connection, "_socket", None)
+    write_message = getattr(ws, "write_message", None)
+    read_message = getattr(ws, "read_message", None)
+    if not (callable(write_message) and callable(read_message)):
+        raise LoadTestError(
+            "Cannot count websocket bytes: unsupported Bokeh client internals "
+            f"in Bokeh {bokeh.__version__}"
+        )
+
+    def size(message: Any) -> int:
+        return (
+            len(message.encode("utf-8")) if isinstance(message, str) else len(message)
+        )
+
+    async def counted_write(message: Any, *args: Any, **kwargs: Any) -> Any:
+        counter["sent"] += size(message)
+        return await write_message(message, *args, **kwargs)
+
+    async def counted_read(*args: Any, **kwargs: Any) -> Any:
+        fragment = await read_message(*args, **kwargs)
+        if fragment is not None:
+            counter["received"] += size(fragment)
+        return fragment
+
+    setattr(ws, "write_message", counted_write)
+    setattr(ws, "read_message", counted_read)
+
+
+def _click(session: ClientSession, button: Button) -> None:
+    """
+    Send a button click from a client session to the server.
+
+    Args:
+        session: Connected client session
+        button: Button to click
+
+    Raises:
+        LoadTestError: If this Bokeh version cannot send UI events
+    """
+    callbacks = session.document.callbacks
+    if not hasattr(callbacks, "send_event"):
+        raise LoadTestError(
+            f"Sending button clicks is not supported by Bokeh {bokeh.__version__}"
+        )
+    callbacks.send_event(ButtonClick(button))
+
+
+def _find_models(session: ClientSession) -> Dict[str, Any]:
+    """
+    Find the models a simulated user interacts with in a session document.
+
+    Args:
+        session: Client session with a pulled document
+
+    Returns:
+        Dict of the data source, encoded selection, text input and buttons
+
+    Raises:
+        LoadTestError: If the application failed to initialize
+    """
+    doc = session.document
+    sources = [m for m in doc.models if isinstance(m, ColumnDataSource)]
+    buttons = {m.label: m for m in doc.models if isinstance(m, Button)}
+    texts = [m for m in doc.models if isinstance(m, TextInput)]
+    try:
+        return {
+            "source": next(s for s in sources if "x" in s.data),
+            "selection": next(s for s in sources if s.name == "selection"),
+            "text": texts[0],
+            "apply": buttons["apply label"],
+            "save": buttons["save labels"],
+        }
+    except (StopIteration, KeyError, IndexError):
+        raise LoadTestError(f"Application did not initialize: {doc.title}")
+
+
+def _simulate_session(
+    url: str,
+    duration: float,
+    rates: Dict[str, float],
+    selection_size: int,
+    seed: int,
+    latencies: Dict[str, List[float]],
+    counter: Dict[str, int],
+    errors: List[str],
+) -> None:
+    """
+    Drive one simulated user session against the server.
+
+    Operations arrive as a Poisson process with the given per-operation
+    rates. Each operation's latency runs from the first change sent until a
+    round trip to the server completes, which includes the server handling
+    the change and sending back any resulting patches.
+
+    Args:
+        url: HTTP URL of the application
+        duration: How long to run for, in seconds
+        rates: Operations per second for each of OPERATIONS
+        selection_size: Number of points in each simulated selection
+        seed: Seed for the random number generator
+        latencies: Per-operation latency lists to append to, in seconds
+        counter: This session's websocket byte totals to update
+        errors: List of error messages to append to
+    """
+    rng = random.Random(seed)
+    session = ClientSession(websocket_url=websocket_url_for_server_url(url))
+    try:
+        session.connect()
+        _count_bytes(session, counter)
+        session.pull()
+        models = _find_models(session)
+        n_points = len(models["source"].data["x"])
+
+        total_rate = sum(rates.values())
+        weights = [rates[op] for op in OPERATIONS]
+        deadline = time.perf_counter() + duration
+
+        while True:
+            next_time = time.perf_counter() + rng.expovariate(total_rate)
+            if next_time > deadline:
+                break
+            time.sleep(max(0.0, next_time - time.perf_counter()))
+
+            op = rng.choices(OPERATIONS, weights)[0]
+            start = time.perf_counter()
+            if op == "select":
+                # Mirror the browser, which only syncs the encoded selection;
+                # lassoed rows are scattered through the file
+                indices = rng.sample(range(n_points), min(selection_size, n_points))
+                models["selection"].data = encode_selection(indices, n_points)
+            elif op == "label":
+                models["text"].value = f"label{rng.randrange(10)}"
+                _click(session, models["apply"])
+            else:
+                _click(session, models["save"])
+            session.force_roundtrip()
+            latencies[op].append(time.perf_counter() - start)
+    except Exception as e:
+        errors.append(f"{type(e).__name__}: {e}")
+    finally:
+        session.close()
+
+
+def summarize_latencies(
+    latencies: Dict[str, List[float]], percentiles: Tuple[int, ...] = (50, 90, 99)
+) -> Dict[str, Dict[str, float]]:
+    """
+    Summarize per-operation latencies.
+
+    Args:
+        latencies: Latencies in seconds for each operation
+        percentiles: Percentiles to report
+
+    Returns:
+        Dict mapping each operation to its count, percentiles and maximum,
+        with latencies in milliseconds
+    """
+    summary = {}
+    for op, values in latencies.items():
+        if not values:
+            continue
+        ms = np.asarray(values) * 1000
+        summary[op] = {
+            "count": len(ms),
+            **{
+                f"p{q}": float(v)
+                for q, v in zip(percentiles, np.percentile(ms, percentiles))
+            },
+            "max": float(ms.max()),
+        }
+    return summary
+
+
+def run_load_test(
+    input_file: str,
+    sessions: int = 10,
+    duration: float = 30.0,
+    select_rate: float = 1.0,
+    label_rate: float = 0.5,
+    save_rate: float = 0.1,
+    selection_size: int = 100,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    Run simulated concurrent sessions against a local labellasso server.
+
+    The server runs in a child process on a copy of the input file, so
+    saves during the test never overwrite real labels.
+
+    Args:
+        input_file: Path to the input CSV file
+        sessions: Number of concurrent sessions
+        duration: How long each session runs for, in seconds
+        select_rate: Selections per second per session
+        label_rate: Label applications per second per session
+        save_rate: Saves per second per session
+        selection_size: Number of points in each simulated selection
+        seed: Seed for the random number generators
+
+    Returns:
+        Report with per-operation latency summaries, server CPU, memory and
+        logged error count, websocket bytes and any session errors
+
+    Raises:
+        FileNotFoundError: If the input file doesn't exist
+        ValueError: If no operation has a positive rate
+        LoadTestError: If the server fails to start
+    """
+    input_path = Path(input_file)
+    if not input_path.exists():
+        raise FileNotFoundError(f"Input file not found: {input_path}")
+
+    rates = {"select": select_rate, "label": label_rate, "save": save_rate}
+    if sum(rates.values()) <= 0:
+        raise ValueError("At least one operation rate must be positive")
+
+    ctx = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        work_file = Path(tmp_dir) / input_path.name
+        shutil.copy(input_path, work_file)
+
+        port = _free_port()
+        ready, stop = ctx.Event(), ctx.Event()
+        stats_recv, stats_send = ctx.Pipe(duplex=False)
+        server = ctx.Process(
+            target=_serve,
+            args=(str(work_file), port, ready, stop, stats_send),
+            daemon=True,
+        )
+        server.start()
+        try:
+            started = time.perf_counter()
+            while not ready.wait(timeout=0.1):
+                if not server.is_alive():
+                    raise LoadTestError("Bokeh server process exited during startup")
+                if time.perf_counter() - started > 60:
+                    raise LoadTestError("Bokeh server did not start within 60 seconds")
+
+            url = f"http://localhost:{port}/"
+            latencies: Dict[str, List[float]] = defaultdict(list)
+            counters = [{"sent": 0, "received": 0} for _ in range(sessions)]
+            errors: List[str] = []
+            threads = [
+                threading.Thread(
+                    target=_simulate_session,
+                    args=(
+                        url,
+                        duration,
+                        rates,
+                        selection_size,
+                        seed + i,
+                        latencies,
+                        counters[i],
+                        errors,
+                    ),
+                )
+                for i in range(sessions)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            stop.set()
+            server_stats: Optional[Dict[str, Any]] = None
+            if stats_recv.poll(timeout=10):
+                server_stats = stats_recv.recv()
+        finally:
+            stop.set()
+            server.join(timeout=10)
+            if server.is_alive():
+                server.terminate()
+
+    if server_stats is not None and server_stats["wall_seconds"] > 0:
+        server_stats["cpu_percent"] = (
+            100 * server_stats["cpu_seconds"] / server_stats["wall_seconds"]
+        )
+
+    return {
+        "sessions": sessions,
+        "duration": duration,
+        "latency_ms": summarize_latencies(latencies),
+        "server": server_stats,
+        "websocket_bytes": {
+            key: sum(counter[key] for counter in counters)
+            for key in ("sent", "received")
+        },
+        "errors": errors,
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """
+    Format a load test report as plain text.
+
+    Args:
+        report: Report returned by run_load_test
+
+    Returns:
+        Human-readable report
+    """
+    lines = [
+        f"Sessions: {report['sessions']}, duration: {report['duration']:.1f}s",
+        "",
+        f"{'operation':<10}{'count':>8}{'p50 ms':>10}{'p90 ms':>10}"
+        f"{'p99 ms':>10}{'max ms':>10}",
+    ]
+    for op, stats in report["latency_ms"].items():
+        lines.append(
+            f"{op:<10}{stats['count']:>8}{stats['p50']:>10.1f}{stats['p90']:>10.1f}"
+            f"{stats['p99']:>10.1f}{stats['max']:>10.1f}"
+        )
+
+    lines.append("")
+    server = report["server"]
+    if server is None:
+        lines.append("Server: no resource usage reported")
+    else:
+        lines.append(
+            f"Server CPU: {server['cpu_seconds']:.2f}s "
+            f"({server.get('cpu_percent', 0.0):.1f}% of one core)"
+        )
+        if server["peak_rss_bytes"] is not None:
+            lines.append(
+                f"Server peak memory: {server['peak_rss_bytes'] / 2**20:.1f} MiB"
+            )
+        lines.append(f"Server errors logged: {server['error_count']}")
+
+    sent = report["websocket_bytes"]["sent"]
+    received = report["websocket_bytes"]["received"]
+    lines.append(
+        f"Websocket bytes: {sent} sent, {received} received "
+        f"({(sent + received) / 2**20:.2f} MiB total)"
+    )
+
+    if report["errors"]:
+        lines.append("")
+        lines.append(f"Errors ({len(report['errors'])}):")
+        lines.extend(f"  {error}" for error in report["errors"])
+
+    return "\n".join(lines)
@@ -4,9 +4,18 @@
 
 """Plotting functionality for labellasso."""
 
-from typing import List, Tuple
-
-from bokeh.models import Button, ColumnDataSource, HoverTool, TextInput
+import html
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from bokeh.models import (
+    Button,
+    ColumnDataSource,
+    CustomJS,
+    Div,
+    HoverTool,
+    TextInput,
+)
 from bokeh.palettes import Category10, Category20
 from bokeh.plotting import figure
 from bokeh.transform import factor_cmap
@@ -16,6 +25,7 @@ def create_scatter_plot(
     source: ColumnDataSource,
     unique_labels: List[str],
     title: str = "Scatter plot lasso labeller",
+    tooltips: Optional[List[Tuple[str, str]]] = None,
 ) -> Tuple[figure, HoverTool]:
     """
     Create a scatter plot for data labeling.
@@ -24,6 +34,7 @@ def create_scatter_plot(
         source: ColumnDataSource containing the data
         unique_labels: List of unique labels in the data
         title: Title for the plot
+        tooltips: Hover tooltips; defaults to the point name and label
 
     Returns:
         Tuple containing the figure and hover tool
@@ -51,12 +62,128 @@ def create_scatter_plot(
     p.scatter(x="x", y="y", source=source, fill_alpha=0.6, size=10, color=cmap)
 
     # Create hover tool
-    hover = HoverTool(tooltips=[("Name", "@name"), ("Label", "@label")])
+    if tooltips is None:
+        tooltips = [("Name", "@name"), ("Label", "@label")]
+    hover = HoverTool(tooltips=tooltips)
     p.add_tools(hover)
 
     return p, hover
 
 
+def create_selection_source(source: ColumnDataSource) -> ColumnDataSource:
+    """
+    Create a compact mirror of the selection of ``source``.
+
+    The browser encodes the selected indices either as typed ``start``/``stop``
+    arrays of half-open ranges or as a packed ``bits`` bitset with one bit per
+    point, whichever is smaller, and Bokeh transfers them as binary buffers.
+    Ranges win only when selected rows are contiguous in the file; a typical
+    lasso is scattered and sent as a bitset. The selection itself is made
+    unsyncable, so the JSON list of every selected index is no longer sent to
+    the server. Decode with labellasso.data.decode_selection.
+
+    Args:
+        source: ColumnDataSource whose selection is mirrored
+
+    Returns:
+        ColumnDataSource named ``selection`` holding the encoded selection
+    """
+    selection = ColumnDataSource(
+        data={
+            "start": np.empty(0, dtype=np.int32),
+            "stop": np.empty(0, dtype=np.int32),
+        },
+        name="selection",
+    )
+    encode = CustomJS(
+        args={"selection": selection, "source": source},
+        code="""
+        const indices = Int32Array.from(cb_obj.indices).sort()
+        const start = []
+        const stop = []
+        for (const i of indices) {
+            const n = stop.length
+            if (n > 0 && i <= stop[n - 1]) {
+                stop[n - 1] = Math.max(stop[n - 1], i + 1)
+            } else {
+                start.push(i)
+                stop.push(i + 1)
+            }
+        }
+        const n_points = source.get_length() ?? 0
+        if (8 * start.length <= Math.ceil(n_points / 8)) {
+            selection.data = {
+                start: Int32Array.from(start),
+                stop: Int32Array.from(stop),
+            }
+        } else {
+            const bits = new Uint8Array(Math.ceil(n_points / 8))
+            for (const i of indices) {
+                bits[i >> 3] |= 0x80 >> (i & 7)
+            }
+            selection.data = {bits: bits}
+        }
+        """,
+    )
+    source.selected.js_on_change("indices", encode)
+    source.selected.syncable = False
+    return selection
+
+
+def create_details_request(hover: HoverTool) -> ColumnDataSource:
+    """
+    Create a source holding the index of the point last hovered over.
+
+    The browser only updates it when the hovered point changes, so the
+    server can look up that point's details on demand.
+
+    Args:
+        hover: Hover tool whose hits are reported
+
+    Returns:
+        ColumnDataSource with a single-element ``index`` column
+    """
+    request = ColumnDataSource(data={"index": np.empty(0, dtype=np.int32)})
+    hover.callback = CustomJS(
+        args={"request": request},
+        code="""
+        const indices = cb_data.index.indices
+        if (indices.length > 0 && request.data.index[0] !== indices[0]) {
+            request.data = {index: Int32Array.of(indices[0])}
+        }
+        """,
+    )
+    return request
+
+
+def create_details_panel() -> Div:
+    """
+    Create a panel for showing details of the hovered point.
+
+    Returns:
+        Div widget
+    """
+    return Div(text="Hover over a point to see its details", width=200)
+
+
+def update_details_panel(div: Div, details: Sequence[Tuple[str, str]]) -> None:
+    """
+    Show point details in the details panel.
+
+    Args:
+        div: Details panel to update
+        details: (column, value) pairs to display
+
+    Returns:
+        None
+    """
+    rows = "".join(
+        f"<tr><th>{html.escape(column)}</th><td>{html.escape(value)}</td></tr>"
+        for column, value in details
+    )
+    div.text = f"<table>{rows}</table>"
+
+
 def create_input_widget(initial_value: str = "label name") -> TextInput:
     """
     Create a text input widget for label entry.
@@ -80,6 +207,16 @@ def create_save_button() -> Button:
     return Button(label="save labels", button_type="success")
 
 
+def create_apply_button() -> Button:
+    """
+    Create a button for applying the entered label to selected points.
+
+    Returns:
+        Button widget
+    """
+    return Button(label="apply label", button_type="primary")
+
+
 def update_plot_title(p: figure, unlabeled_percentage: float) -> None:
     """
     Update the plot title with labeling progress.
@@ -0,0 +1,279 @@
+# SPDX-FileCopyrightText: 2023-present Henry Watkins <h.watkins@ucl.ac.uk>
+#
+# SPDX-License-Identifier: MIT
+
+"""2D projection of high-dimensional feature columns for labellasso."""
+
+import fnmatch
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from labellasso.data import DataValidationError
+
+PROJECTION_METHODS = ("pca", "random", "umap")
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "labellasso"
+
+# Columns the app itself uses, which are never projected
+RESERVED_COLUMNS = ("name", "label", "x", "y")
+
+
+def resolve_feature_columns(input_file: Path, patterns: Sequence[str]) -> List[str]:
+    """
+    Resolve feature column names or shell-style patterns against a CSV header.
+
+    Patterns never match the RESERVED_COLUMNS, so ``*`` selects every other
+    column.
+
+    Args:
+        input_file: Path to the input CSV file
+        patterns: Column names or patterns such as ``emb_*``
+
+    Returns:
+        Matching column names, in file order
+
+    Raises:
+        DataValidationError: If a reserved column is named as a feature, or a
+            pattern matches no columns
+    """
+    header = list(pd.read_csv(input_file, index_col=False, nrows=0).columns)
+    candidates = [column for column in header if column not in RESERVED_COLUMNS]
+    selected = set()
+    for pattern in patterns:
+        if pattern in RESERVED_COLUMNS:
+            raise DataValidationError(
+                f"Column '{pattern}' is reserved and cannot be a feature"
+            )
+        matches = fnmatch.filter(candidates, pattern)
+        if not matches:
+            raise DataValidationError(f"No columns match feature pattern '{pattern}'")
+        selected.update(matches)
+    return [column for column in header if column in selected]
+
+
+def _iter_feature_chunks(
+    input_file: Path, feature_columns: Sequence[str], chunksize: int
+) -> Iterator[np.ndarray]:
+    """
+    Stream the feature columns of a CSV file as float64 arrays.
+
+    Args:
+        input_file: Path to the input CSV file
+        feature_columns: Columns to read
+        chunksize: Number of rows per chunk
+
+    Yields:
+        Arrays of shape (rows, len(feature_columns))
+
+    Raises:
+        DataValidationError: If a feature value is missing or not numeric
+    """
+    try:
+        reader = pd.read_csv(
+            input_file,
+            index_col=False,
+            usecols=list(feature_columns),
+            dtype={column: np.float64 for column in feature_columns},
+            chunksize=chunksize,
+        )
+        for chunk in reader:
+            values = chunk[list(feature_columns)].to_numpy()
+            if np.isnan(values).any():
+                raise DataValidationError("Feature columns contain missing values")
+            yield values
+    except (pd.errors.ParserError, ValueError) as e:
+        raise DataValidationError(f"Failed to read feature columns: {e}")
+
+
+def _project_pca(
+    input_file: Path, feature_columns: Sequence[str], chunksize: int
+) -> np.ndarray:
+    """
+    Project features onto their first two principal components.
+
+    The covariance matrix is accumulated over chunks in one pass and the
+    data projected in a second, so memory use is independent of file size.
+    """
+    n_features = len(feature_columns)
+    shift: Optional[np.ndarray] = None
+    count = 0
+    total = np.zeros(n_features)
+    cross = np.zeros((n_features, n_features))
+
+    for values in _iter_feature_chunks(input_file, feature_columns, chunksize):
+        # Shift by the first chunk's mean to limit cancellation error
+        if shift is None:
+            shift = values.mean(axis=0)
+        shifted = values - shift
+        count += len(shifted)
+        total += shifted.sum(axis=0)
+        cross += shifted.T @ shifted
+
+    if count < 2:
+        raise DataValidationError("PCA projection requires at least two rows")
+    assert shift is not None
+
+    mean = total / count
+    covariance = (cross - count * np.outer(mean, mean)) / (count - 1)
+    eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+    components = eigenvectors[:, np.argsort(eigenvalues)[::-1][:2]]
+    if components.shape[1] < 2:
+        components = np.pad(components, ((0, 0), (0, 2 - components.shape[1])))
+
+    # Fix the sign of each component so results are reproducible
+    signs = np.sign(components[np.abs(components).argmax(axis=0), [0, 1]])
+    components *= np.where(signs == 0, 1, signs)
+
+    center = shift + mean
+    return np.concatenate(
+        [
+            (values - center) @ components
+            for values in _iter_feature_chunks(input_file, feature_columns, chunksize)
+        ]
+    )
+
+
+def _project_random(
+    input_file: Path, feature_columns: Sequence[str], chunksize: int, seed: int
+) -> np.ndarray:
+    """Project features onto two random Gaussian directions in one pass."""
+    rng = np.random.default_rng(seed)
+    directions = rng.standard_normal((len(feature_columns), 2)) / np.sqrt(2)
+    return np.concatenate(
+        [
+            values @ directions
+            for values in _iter_feature_chunks(input_file, feature_columns, chunksize)
+        ]
+    )
+
+
+def _project_umap(
+    input_file: Path, feature_columns: Sequence[str], chunksize: int, seed: int
+) -> np.ndarray:
+    """Project features with UMAP, which needs all rows in memory."""
+    try:
+        import umap
+    except ImportError:
+        raise ImportError(
+            "UMAP projection requires the umap-learn package: "
+            "pip install 'labellasso[umap]'"
+        )
+
+    values = np.concatenate(
+        list(_iter_feature_chunks(input_file, feature_columns, chunksize))
+    )
+    return np.asarray(
+        umap.UMAP(n_components=2, random_state=seed).fit_transform(values),
+        dtype=np.float64,
+    )
+
+
+def projection_cache_path(
+    input_file: Path,
+    feature_columns: Sequence[str],
+    method: str,
+    seed: int,
+    cache_dir: Path,
+) -> Path:
+    """
+    Get the cache file for a projection.
+
+    The key combines a fingerprint of the input file (resolved path, size
+    and modification time) with the projection parameters.
+
+    Args:
+        input_file: Path to the input CSV file
+        feature_columns: Columns that are projected
+        method: Projection method
+        seed: Random seed
+        cache_dir: Directory holding cached projections
+
+    Returns:
+        Path of the cached projection
+    """
+    stat = input_file.stat()
+    key = json.dumps(
+        {
+            "path": str(input_file.resolve()),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "features": list(feature_columns),
+            "method": method,
+            "seed": seed,
+        },
+        sort_keys=True,
+    )
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+    return cache_dir / f"{input_file.stem}-{method}-{digest}.npy"
+
+
+def project_features(
+    input_file: Path,
+    feature_columns: Sequence[str],
+    method: str = "pca",
+    chunksize: int = 100_000,
+    seed: int = 0,
+    cache_dir: Optional[Path] = DEFAULT_CACHE_DIR,
+) -> Tuple[np.ndarray, bool]:
+    """
+    Compute a 2D layout of feature columns, reusing a cached result if present.
+
+    Args:
+        input_file: Path to the input CSV file
+        feature_columns: Columns to project
+        method: Projection method, one of PROJECTION_METHODS
+        chunksize: Number of rows read per chunk
+        seed: Random seed for the random and UMAP projections
+        cache_dir: Directory for cached projections, or None to disable caching
+
+    Returns:
+        Tuple containing:
+        - Array of shape (rows, 2) with the x and y coordinates
+        - Whether the result was loaded from the cache
+
+    Raises:
+        FileNotFoundError: If the input file doesn't exist
+        ValueError: If the method is not recognised
+        DataValidationError: If the feature columns cannot be read
+        ImportError: If the method's optional dependency is not installed
+    """
+    if method not in PROJECTION_METHODS:
+        raise ValueError(
+            f"Unknown projection method '{method}', "
+            f"expected one of: {', '.join(PROJECTION_METHODS)}"
+        )
+    if not input_file.exists():
+        raise FileNotFoundError(f"Input file not found: {input_file}")
+    if not feature_columns:
+        raise DataValidationError("No feature columns given for projection")
+
+    cache_path = None
+    if cache_dir is not None:
+        cache_path = projection_cache_path(
+            input_file, feature_columns, method, seed, cache_dir
+        )
+        if cache_path.exists():
+            return np.load(cache_path), True
+
+    if method == "pca":
+        coordinates = _project_pca(input_file, feature_columns, chunksize)
+    elif method == "random":
+        coordinates = _project_random(input_file, feature_columns, chunksize, seed)
+    else:
+        coordinates = _project_umap(input_file, feature_columns, chunksize, seed)
+
+    if cache_path is not None:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename so a concurrent reader never sees a partial file
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.save(f, coordinates)
+        os.replace(tmp_path, cache_path)
+
+    return coordinates, False
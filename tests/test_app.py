@@ -0,0 +1,57 @@
+# SPDX-FileCopyrightText: 2023-present Henry Watkins <h.watkins@ucl.ac.uk>
+#
+# SPDX-License-Identifier: MIT
+
+"""Tests for the app module in the labellasso package."""
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from bokeh.document import Document
+
+from labellasso.app import create_bokeh_app
+from labellasso.data import DataValidationError
+
+
+def test_create_bokeh_app_merges_labels_once(
+    sample_csv_file: Path, sample_data_dir: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that label files are merged once, not once per session."""
+    label_path = sample_data_dir / "previous_labelled.csv"
+    pd.DataFrame({"name": ["point1", "point2"], "label": ["a", "b"]}).to_csv(
+        label_path, index=False
+    )
+    report_path = sample_data_dir / "conflicts.csv"
+
+    app = create_bokeh_app(
+        str(sample_csv_file), [str(label_path)], conflict_report_path=str(report_path)
+    )
+    assert report_path.exists()
+
+    # Sessions must not re-read the label files
+    def fail(*args: object) -> None:
+        raise AssertionError("labels were merged again")
+
+    monkeypatch.setattr("labellasso.app.merge_labels", fail)
+    for _ in range(2):
+        doc = Document()
+        app(doc)
+        assert doc.title == "LabelLasso"
+
+
+def test_create_bokeh_app_with_invalid_label_file(
+    sample_csv_file: Path, sample_data_dir: Path
+) -> None:
+    """Test that merge errors are raised rather than shown in the page."""
+    label_path = sample_data_dir / "no_labels.csv"
+    pd.DataFrame({"name": ["point1"]}).to_csv(label_path, index=False)
+
+    with pytest.raises(DataValidationError):
+        create_bokeh_app(str(sample_csv_file), [str(label_path)])
+
+
+def test_create_bokeh_app_with_missing_detail_column(sample_csv_file: Path) -> None:
+    """Test that unknown detail columns are rejected before serving."""
+    with pytest.raises(DataValidationError, match="Missing detail columns: nope"):
+        create_bokeh_app(str(sample_csv_file), details=True, detail_columns=["nope"])
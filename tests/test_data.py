@@ -6,15 +6,25 @@
 
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 import pytest
+from bokeh.document import Document
+from bokeh.document.events import ColumnDataChangedEvent, ColumnsPatchedEvent
 from bokeh.models import ColumnDataSource
 
 from labellasso.data import (
     DataValidationError,
     create_column_data_source,
+    create_details_lookup,
+    decode_index_ranges,
+    decode_selection,
+    encode_index_ranges,
+    encode_selection,
     get_label_statistics,
     load_data,
+    merge_labels,
+    read_label_file,
     save_data,
     update_labels,
 )
@@ -63,6 +73,34 @@ def test_load_data_with_missing_columns(sample_data_dir: Path) -> None:
     assert "y" in str(excinfo.value)
 
 
+def test_load_data_with_coordinates(sample_data_dir: Path) -> None:
+    """Test loading data with precomputed coordinates instead of x/y columns."""
+    csv_path = sample_data_dir / "no_coordinates.csv"
+    pd.DataFrame({"name": ["point1", "point2"], "f": [0.1, 0.2]}).to_csv(
+        csv_path, index=False
+    )
+
+    df, _ = load_data(csv_path, np.array([[1.0, 2.0], [3.0, 4.0]]))
+
+    assert list(df["x"]) == [1.0, 3.0]
+    assert list(df["y"]) == [2.0, 4.0]
+
+    with pytest.raises(DataValidationError):
+        load_data(csv_path, np.zeros((3, 2)))
+
+
+def test_load_data_with_excluded_columns(sample_data_dir: Path) -> None:
+    """Test that projected feature columns are not loaded."""
+    csv_path = sample_data_dir / "features.csv"
+    pd.DataFrame(
+        {"name": ["point1", "point2"], "f0": [0.1, 0.2], "f1": [0.3, 0.4]}
+    ).to_csv(csv_path, index=False)
+
+    df, _ = load_data(csv_path, np.zeros((2, 2)), ["f0", "f1"])
+
+    assert set(df.columns) == {"name", "x", "y", "label"}
+
+
 def test_create_column_data_source(sample_df: pd.DataFrame) -> None:
     """Test creating a ColumnDataSource from a DataFrame."""
     # Create ColumnDataSource
@@ -77,6 +115,41 @@ def test_create_column_data_source(sample_df: pd.DataFrame) -> None:
     assert len(source.data["name"]) == 5
 
 
+def test_create_column_data_source_with_columns(sample_df: pd.DataFrame) -> None:
+    """Test creating a ColumnDataSource from a subset of columns."""
+    source = create_column_data_source(sample_df, ["x", "y", "label"])
+
+    assert set(source.data) == {"x", "y", "label"}
+    assert len(source.data["x"]) == 5
+
+
+def test_create_details_lookup(sample_df: pd.DataFrame) -> None:
+    """Test looking up point details by row index."""
+    lookup = create_details_lookup(sample_df, ["name", "label"])
+
+    assert lookup(2) == (("name", "point3"), ("label", "label1"))
+
+
+def test_create_details_lookup_reads_label_live(
+    sample_df: pd.DataFrame, sample_column_source: ColumnDataSource
+) -> None:
+    """Test that relabelled points show their new label after a cached lookup."""
+    lookup = create_details_lookup(sample_df, ["name", "label"])
+    assert lookup(0) == (("name", "point1"), ("label", ""))
+
+    update_labels(sample_df, sample_column_source, [0], "new_label")
+
+    assert lookup(0) == (("name", "point1"), ("label", "new_label"))
+
+
+def test_create_details_lookup_with_missing_column(sample_df: pd.DataFrame) -> None:
+    """Test creating a details lookup with an unknown column."""
+    with pytest.raises(DataValidationError) as excinfo:
+        create_details_lookup(sample_df, ["name", "colour"])
+
+    assert "colour" in str(excinfo.value)
+
+
 def test_save_data(sample_df: pd.DataFrame, tmp_path: Path) -> None:
     """Test saving data to a CSV file."""
     # Define output path
@@ -122,3 +195,200 @@ def test_update_labels(
     assert updated_df.loc[2, "label"] == "label1"  # Unchanged
     assert updated_df.loc[3, "label"] == ""  # Unchanged
     assert updated_df.loc[4, "label"] == "label2"  # Unchanged
+
+    # Check that the source label column was patched
+    assert list(sample_column_source.data["label"]) == list(updated_df["label"])
+
+
+def test_update_labels_with_empty_selection(
+    sample_df: pd.DataFrame, sample_column_source: ColumnDataSource
+) -> None:
+    """Test that an empty selection leaves labels unchanged."""
+    updated_df = update_labels(
+        sample_df, sample_column_source, np.empty(0, dtype=np.int64), "new_label"
+    )
+
+    assert "new_label" not in set(updated_df["label"])
+
+
+def _label_events(df: pd.DataFrame, indices: np.ndarray) -> list:
+    """Update labels on a source attached to a document, recording its events."""
+    source = create_column_data_source(df)
+    doc = Document()
+    doc.add_root(source)
+    events: list = []
+    doc.on_change(lambda event: events.append(event))
+
+    update_labels(df, source, indices, "new_label")
+
+    assert list(source.data["label"]) == list(df["label"])
+    return events
+
+
+def test_update_labels_patches_contiguous_selection() -> None:
+    """Test that a contiguous selection is sent as a patch."""
+    df = pd.DataFrame(
+        {"name": [f"p{i}" for i in range(1000)], "x": 0.0, "y": 0.0, "label": ""}
+    )
+
+    events = _label_events(df, np.arange(100, 200))
+
+    assert [type(e) for e in events] == [ColumnsPatchedEvent]
+
+
+def test_update_labels_replaces_column_for_scattered_selection() -> None:
+    """Test that a scattered selection resends only the label column."""
+    df = pd.DataFrame(
+        {"name": [f"p{i}" for i in range(1000)], "x": 0.0, "y": 0.0, "label": ""}
+    )
+
+    events = _label_events(df, np.arange(0, 1000, 2))
+
+    assert [type(e) for e in events] == [ColumnDataChangedEvent]
+    assert events[0].cols == ["label"]
+    assert (df["label"].iloc[::2] == "new_label").all()
+    assert (df["label"].iloc[1::2] == "").all()
+
+
+def test_encode_index_ranges() -> None:
+    """Test run-length encoding of unsorted, repeated indices."""
+    starts, stops = encode_index_ranges([7, 2, 3, 4, 3, 9, 8, 0])
+
+    assert list(starts) == [0, 2, 7]
+    assert list(stops) == [1, 5, 10]
+
+
+def test_decode_index_ranges_round_trip() -> None:
+    """Test that decoding encoded ranges recovers the sorted unique indices."""
+    rng = np.random.default_rng(0)
+    indices = rng.choice(10_000, size=3_000, replace=False)
+
+    decoded = decode_index_ranges(*encode_index_ranges(indices))
+
+    assert np.array_equal(decoded, np.sort(indices))
+    assert decode_index_ranges([], []).size == 0
+
+
+def test_encode_selection_picks_smaller_form() -> None:
+    """Test that contiguous selections use ranges and scattered ones a bitset."""
+    contiguous = encode_selection(np.arange(100, 600), 10_000)
+    assert set(contiguous) == {"start", "stop"}
+    assert np.array_equal(decode_selection(contiguous, 10_000), np.arange(100, 600))
+
+    rng = np.random.default_rng(0)
+    indices = rng.choice(10_000, size=900, replace=False)
+    scattered = encode_selection(indices, 10_000)
+    assert set(scattered) == {"bits"}
+    assert scattered["bits"].nbytes == 1250
+    assert np.array_equal(decode_selection(scattered, 10_000), np.sort(indices))
+
+
+@pytest.fixture
+def sample_label_file(sample_data_dir: Path) -> Path:
+    """Create a labelled CSV file with partial, conflicting and unknown labels."""
+    data = {
+        "name": ["point1", "point3", "point5", "point9", "point1", "point4"],
+        "x": [0.0] * 6,
+        "y": [0.0] * 6,
+        "label": ["old", "label1", "other", "ghost", "label0", ""],
+    }
+    csv_path = sample_data_dir / "previous_labelled.csv"
+    pd.DataFrame(data).to_csv(csv_path, index=False)
+    return csv_path
+
+
+def test_read_label_file(sample_label_file: Path) -> None:
+    """Test reading labels drops empty labels and keeps the last duplicate."""
+    labels = read_label_file(sample_label_file)
+
+    assert labels.index.is_unique
+    assert labels["point1"] == "label0"
+    assert "point4" not in labels.index
+    assert len(labels) == 4
+
+
+def test_read_label_file_parquet_without_engine(
+    sample_data_dir: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that a missing Parquet engine gives an install hint."""
+    parquet_path = sample_data_dir / "labels.parquet"
+    parquet_path.write_bytes(b"")
+
+    def no_engine(*args: object, **kwargs: object) -> None:
+        raise ImportError("Unable to find a usable engine")
+
+    monkeypatch.setattr(pd, "read_parquet", no_engine)
+    with pytest.raises(ImportError) as excinfo:
+        read_label_file(parquet_path)
+
+    assert "labellasso[parquet]" in str(excinfo.value)
+
+
+@pytest.mark.parametrize(
+    "policy, expected",
+    [
+        ("keep", ["label0", "", "label1", "", "label2"]),
+        ("overwrite", ["label0", "", "label1", "", "other"]),
+        ("flag", ["label0", "", "label1", "", ""]),
+    ],
+)
+def test_merge_labels_policies(
+    sample_df: pd.DataFrame, sample_label_file: Path, policy: str, expected: list
+) -> None:
+    """Test merging labels under each conflict policy."""
+    merged, report = merge_labels(sample_df, [sample_label_file], policy)
+
+    assert list(merged["label"]) == expected
+
+    # Only point5 has a differing, non-empty existing label
+    assert list(report["name"]) == ["point5"]
+    assert report.loc[0, "existing_label"] == "label2"
+    assert report.loc[0, "incoming_label"] == "other"
+    assert report.loc[0, "source"] == str(sample_label_file)
+
+
+def test_merge_labels_flag_across_files(sample_data_dir: Path) -> None:
+    """Test that flagged points stay unlabelled and later conflicts are reported."""
+    df = pd.DataFrame({"name": ["p1"], "x": [0.0], "y": [0.0], "label": ["cow"]})
+    paths = []
+    for filename, label in [("a.csv", "cat"), ("b.csv", "dog")]:
+        path = sample_data_dir / filename
+        pd.DataFrame({"name": ["p1"], "label": [label]}).to_csv(path, index=False)
+        paths.append(path)
+
+    merged, report = merge_labels(df, paths, "flag")
+
+    assert list(merged["label"]) == [""]
+    assert list(report["existing_label"]) == ["cow", "cow"]
+    assert list(report["incoming_label"]) == ["cat", "dog"]
+
+
+def test_merge_labels_with_numeric_names(sample_data_dir: Path) -> None:
+    """Test that numeric-looking and zero-padded names match as strings."""
+    csv_path = sample_data_dir / "numeric.csv"
+    csv_path.write_text("name,x,y\n001,1.0,1.0\n002,2.0,2.0\n1.50,3.0,3.0\n")
+    label_path = sample_data_dir / "numeric_labelled.csv"
+    label_path.write_text("name,label\n001,a\n002,b\n1.50,c\n1,wrong\n")
+
+    df, _ = load_data(csv_path)
+    merged, report = merge_labels(df, [label_path])
+
+    assert list(merged["name"]) == ["001", "002", "1.50"]
+    assert list(merged["label"]) == ["a", "b", "c"]
+    assert report.empty
+
+
+def test_merge_labels_with_invalid_policy(
+    sample_df: pd.DataFrame, sample_label_file: Path
+) -> None:
+    """Test merging labels with an unknown conflict policy."""
+    with pytest.raises(ValueError):
+        merge_labels(sample_df, [sample_label_file], "ignore")
+
+
+def test_merge_labels_with_missing_label_column(
+    sample_df: pd.DataFrame, sample_csv_file: Path
+) -> None:
+    """Test merging from a file without a label column."""
+    with pytest.raises(DataValidationError):
+        merge_labels(sample_df, [sample_csv_file])
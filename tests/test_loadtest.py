@@ -0,0 +1,102 @@
+# SPDX-FileCopyrightText: 2023-present Henry Watkins <h.watkins@ucl.ac.uk>
+#
+# SPDX-License-Identifier: MIT
+
+"""Tests for the loadtest module in the labellasso package."""
+
+from pathlib import Path
+
+import pytest
+from bokeh.client import ClientSession
+
+from labellasso.loadtest import (
+    LoadTestError,
+    _count_bytes,
+    format_report,
+    run_load_test,
+    summarize_latencies,
+)
+
+
+def test_summarize_latencies() -> None:
+    """Test summarizing latencies into millisecond percentiles."""
+    latencies = {"select": [0.001 * i for i in range(1, 101)], "save": []}
+
+    summary = summarize_latencies(latencies)
+
+    # Operations without samples are omitted
+    assert set(summary) == {"select"}
+    assert summary["select"]["count"] == 100
+    assert summary["select"]["p50"] == pytest.approx(50.5)
+    assert summary["select"]["max"] == pytest.approx(100.0)
+
+
+def test_format_report() -> None:
+    """Test formatting a load test report."""
+    report = {
+        "sessions": 2,
+        "duration": 5.0,
+        "latency_ms": summarize_latencies({"label": [0.01, 0.02]}),
+        "server": {
+            "cpu_seconds": 1.0,
+            "wall_seconds": 4.0,
+            "cpu_percent": 25.0,
+            "peak_rss_bytes": 100 * 2**20,
+            "error_count": 3,
+        },
+        "websocket_bytes": {"sent": 1000, "received": 2000},
+        "errors": ["RuntimeError: disconnected"],
+    }
+
+    text = format_report(report)
+
+    assert "label" in text
+    assert "25.0% of one core" in text
+    assert "100.0 MiB" in text
+    assert "Server errors logged: 3" in text
+    assert "1000 sent, 2000 received" in text
+    assert "RuntimeError: disconnected" in text
+
+
+def test_count_bytes_without_connection() -> None:
+    """Test that byte counting fails clearly when there is no websocket."""
+    session = ClientSession(websocket_url="ws://localhost:1/ws")
+
+    with pytest.raises(LoadTestError) as excinfo:
+        _count_bytes(session, {"sent": 0, "received": 0})
+
+    assert "websocket bytes" in str(excinfo.value)
+
+
+def test_run_load_test_with_nonexistent_file() -> None:
+    """Test load testing a non-existent input file."""
+    with pytest.raises(FileNotFoundError):
+        run_load_test("/nonexistent/file.csv")
+
+
+def test_run_load_test_with_zero_rates(sample_csv_file: Path) -> None:
+    """Test load testing with no operations to perform."""
+    with pytest.raises(ValueError):
+        run_load_test(str(sample_csv_file), select_rate=0, label_rate=0, save_rate=0)
+
+
+def test_run_load_test(sample_csv_file: Path) -> None:
+    """Test a short load test against a local server."""
+    report = run_load_test(
+        str(sample_csv_file),
+        sessions=2,
+        duration=1.0,
+        select_rate=5.0,
+        label_rate=5.0,
+        save_rate=2.0,
+        selection_size=2,
+    )
+
+    assert report["errors"] == []
+    assert report["latency_ms"]
+    assert report["websocket_bytes"]["received"] > 0
+    assert report["server"]["cpu_seconds"] > 0
+    assert isinstance(report["server"]["error_count"], int)
+
+    # Saves go to a temporary copy, never next to the original input
+    assert not (sample_csv_file.parent / "sample_labelled.csv").exists()
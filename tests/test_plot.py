@@ -4,13 +4,25 @@
 
 """Tests for the plot module in the labellasso package."""
 
-from bokeh.models import Button, ColumnDataSource, HoverTool, TextInput
+from bokeh.models import (
+    Button,
+    ColumnDataSource,
+    CustomJS,
+    Div,
+    HoverTool,
+    TextInput,
+)
 from bokeh.plotting import figure
 
 from labellasso.plot import (
+    create_apply_button,
+    create_details_panel,
+    create_details_request,
     create_input_widget,
     create_save_button,
     create_scatter_plot,
+    create_selection_source,
+    update_details_panel,
     update_plot_title,
 )
 
@@ -52,6 +64,38 @@ def test_create_scatter_plot_with_custom_title(
     assert p.title.text == custom_title
 
 
+def test_create_scatter_plot_with_custom_tooltips(
+    sample_column_source: ColumnDataSource,
+) -> None:
+    """Test creating a scatter plot with custom hover tooltips."""
+    _, hover = create_scatter_plot(
+        sample_column_source, ["label1", "label2", ""], tooltips=[("Label", "@label")]
+    )
+
+    assert hover.tooltips == [("Label", "@label")]
+
+
+def test_create_details_request() -> None:
+    """Test creating the hovered-point request source."""
+    hover = HoverTool()
+    request = create_details_request(hover)
+
+    assert isinstance(request, ColumnDataSource)
+    assert len(request.data["index"]) == 0
+    assert isinstance(hover.callback, CustomJS)
+
+
+def test_update_details_panel() -> None:
+    """Test rendering point details in the details panel."""
+    panel = create_details_panel()
+    assert isinstance(panel, Div)
+
+    update_details_panel(panel, [("name", "<point1>"), ("label", "a")])
+
+    assert "&lt;point1&gt;" in panel.text
+    assert "<th>label</th><td>a</td>" in panel.text
+
+
 def test_create_input_widget() -> None:
     """Test creating a text input widget."""
     # Create input widget
@@ -84,6 +128,31 @@ def test_create_save_button() -> None:
     assert button.button_type == "success"
 
 
+def test_create_apply_button() -> None:
+    """Test creating an apply label button."""
+    button = create_apply_button()
+
+    assert isinstance(button, Button)
+    assert button.label.lower() == "apply label"
+
+
+def test_create_selection_source(sample_column_source: ColumnDataSource) -> None:
+    """Test creating an encoded mirror of the selection."""
+    selection = create_selection_source(sample_column_source)
+
+    assert isinstance(selection, ColumnDataSource)
+    assert selection.name == "selection"
+    assert set(selection.data) == {"start", "stop"}
+    assert len(selection.data["start"]) == 0
+
+    # Check that the browser-side encoder is attached to the selection
+    callbacks = sample_column_source.selected.js_property_callbacks
+    assert any(isinstance(cb, CustomJS) for cb in callbacks["change:indices"])
+
+    # The full index list must not be synced back to the server
+    assert not sample_column_source.selected.syncable
+
+
 def test_update_plot_title() -> None:
     """Test updating the plot title with labeling progress."""
     # Create figure
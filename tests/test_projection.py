@@ -0,0 +1,128 @@
+# SPDX-FileCopyrightText: 2023-present Henry Watkins <h.watkins@ucl.ac.uk>
+#
+# SPDX-License-Identifier: MIT
+
+"""Tests for the projection module in the labellasso package."""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from labellasso import projection
+from labellasso.data import DataValidationError
+from labellasso.projection import project_features, resolve_feature_columns
+
+
+@pytest.fixture
+def sample_features() -> np.ndarray:
+    """Create correlated high-dimensional features."""
+    rng = np.random.default_rng(0)
+    latent = rng.standard_normal((200, 2)) * [5.0, 2.0]
+    return latent @ rng.standard_normal((2, 6)) + 0.1 * rng.standard_normal((200, 6))
+
+
+@pytest.fixture
+def sample_feature_file(sample_data_dir: Path, sample_features: np.ndarray) -> Path:
+    """Create a CSV file with names and feature columns but no coordinates."""
+    df = pd.DataFrame(sample_features, columns=[f"emb_{i}" for i in range(6)])
+    df.insert(0, "name", [f"point{i}" for i in range(len(df))])
+    csv_path = sample_data_dir / "features.csv"
+    df.to_csv(csv_path, index=False)
+    return csv_path
+
+
+def test_resolve_feature_columns(sample_feature_file: Path) -> None:
+    """Test resolving feature names and patterns against the header."""
+    columns = resolve_feature_columns(sample_feature_file, ["emb_5", "emb_[0-2]"])
+
+    assert columns == ["emb_0", "emb_1", "emb_2", "emb_5"]
+
+    with pytest.raises(DataValidationError):
+        resolve_feature_columns(sample_feature_file, ["missing_*"])
+
+
+def test_resolve_feature_columns_skips_reserved_columns(
+    sample_feature_file: Path,
+) -> None:
+    """Test that patterns skip the name column and naming it is rejected."""
+    columns = resolve_feature_columns(sample_feature_file, ["*"])
+
+    assert columns == [f"emb_{i}" for i in range(6)]
+
+    with pytest.raises(DataValidationError, match="reserved"):
+        resolve_feature_columns(sample_feature_file, ["name"])
+
+
+def test_project_features_pca(
+    sample_feature_file: Path, sample_features: np.ndarray
+) -> None:
+    """Test that chunked PCA matches an in-memory SVD."""
+    columns = [f"emb_{i}" for i in range(6)]
+    coordinates, cached = project_features(
+        sample_feature_file, columns, "pca", chunksize=37, cache_dir=None
+    )
+
+    centered = sample_features - sample_features.mean(axis=0)
+    _, _, vt = np.linalg.svd(centered, full_matrices=False)
+    expected = centered @ vt[:2].T
+
+    assert not cached
+    assert coordinates.shape == (200, 2)
+    # Components are only defined up to sign
+    np.testing.assert_allclose(np.abs(coordinates), np.abs(expected), atol=1e-8)
+
+
+def test_project_features_random(sample_feature_file: Path) -> None:
+    """Test that random projection is chunk-independent and seeded."""
+    columns = [f"emb_{i}" for i in range(6)]
+    first, _ = project_features(
+        sample_feature_file, columns, "random", chunksize=13, cache_dir=None
+    )
+    second, _ = project_features(
+        sample_feature_file, columns, "random", chunksize=500, cache_dir=None
+    )
+
+    assert first.shape == (200, 2)
+    np.testing.assert_allclose(first, second)
+
+
+def test_project_features_cache(
+    sample_feature_file: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that a cached projection is reused without recomputation."""
+    columns = ["emb_0", "emb_1", "emb_2"]
+    cache_dir = tmp_path / "cache"
+    coordinates, cached = project_features(
+        sample_feature_file, columns, cache_dir=cache_dir
+    )
+    assert not cached
+    assert len(list(cache_dir.glob("*.npy"))) == 1
+
+    def fail(*args: object) -> None:
+        raise AssertionError("projection was recomputed")
+
+    monkeypatch.setattr(projection, "_project_pca", fail)
+    reloaded, cached = project_features(
+        sample_feature_file, columns, cache_dir=cache_dir
+    )
+
+    assert cached
+    np.testing.assert_array_equal(reloaded, coordinates)
+
+    # Different parameters use a different cache entry
+    project_features(sample_feature_file, columns, "random", cache_dir=cache_dir)
+    assert len(list(cache_dir.glob("*.npy"))) == 2
+
+
+def test_project_features_with_invalid_method(sample_feature_file: Path) -> None:
+    """Test projecting with an unknown method."""
+    with pytest.raises(ValueError):
+        project_features(sample_feature_file, ["emb_0"], "tsne", cache_dir=None)
+
+
+def test_project_features_with_non_numeric_column(sample_feature_file: Path) -> None:
+    """Test projecting a non-numeric column."""
+    with pytest.raises(DataValidationError):
+        project_features(sample_feature_file, ["name"], cache_dir=None)